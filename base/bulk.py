@@ -0,0 +1,239 @@
+import os
+import glob
+import fcntl
+import logging
+
+from base.database import db
+
+_DROPPED_INDEXES = '_dropped_index'
+
+# Default SQLITE_MAX_VARIABLE_NUMBER.
+_MAX_VARIABLES = 999
+
+class Loader:
+    """Saves scraped rows, optionally ignoring duplicates."""
+
+    _CHECKPOINT = 1000000
+
+    def __init__(self, model, bulk=False, ignore=True):
+        self.model = model
+        self.bulk = bulk
+        self.ignore = ignore
+        self.table = model._meta.table_name
+        self.columns = _columns(self.table)
+        self.staged = 0
+
+    def __enter__(self):
+        if self.bulk:
+            self._begin()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.bulk:
+            return
+
+        try:
+            _detach()
+
+            if exc_type is None:
+                _finish(self.table)
+            else:
+                # Merging and rebuilding indexes may take long, leave it to the next run.
+                logging.warning('Bulk load into {} stopped, staged rows are left for `ctl recover`'
+                                .format(self.table))
+        finally:
+            self.lock.close()
+
+    def insert(self, rows):
+        if not rows:
+            return
+
+        if self.bulk:
+            self._stage(rows)
+            return
+
+        n = _MAX_VARIABLES // len(self.columns)
+
+        with db.atomic():
+            for i in range(0, len(rows), n):
+                query = self.model.insert_many(rows[i:i+n])
+
+                if self.ignore:
+                    query = query.on_conflict('IGNORE')
+
+                query.execute()
+
+    def checkpoint(self):
+        merged = _merge(self.table)
+        logging.info('Merged {} of {} staged rows into {}'.format(merged, self.staged, self.table))
+        self.staged = 0
+
+    def _begin(self):
+        self.lock = _lock(self.table)
+
+        if self.lock is None:
+            raise RuntimeError('Another bulk load into {} is running'.format(self.table))
+
+        # Staged rows live in a separate file, so only it is written without syncs.
+        _attach(self.table)
+
+        # Dropped indexes are recorded in the main database to be rebuilt by `_finish`.
+        with db.atomic():
+            db.execute_sql('CREATE TABLE IF NOT EXISTS "{}" (tbl TEXT, name TEXT PRIMARY KEY, sql TEXT)'
+                           .format(_DROPPED_INDEXES))
+            db.execute_sql('CREATE TABLE IF NOT EXISTS bulk.staged ({})'.format(_column_defs(self.table)))
+            db.execute_sql('CREATE TABLE IF NOT EXISTS bulk.options (ignore_duplicates INTEGER)')
+            db.execute_sql('DELETE FROM bulk.options')
+            db.execute_sql('INSERT INTO bulk.options VALUES (?)', (self.ignore,))
+
+            # Unique indexes are kept: the merge relies on them to skip duplicates.
+            indexes = db.execute_sql("SELECT name, sql FROM main.sqlite_master "
+                                     "WHERE type = 'index' AND tbl_name = ? "
+                                     "AND sql NOT LIKE 'CREATE UNIQUE%'", (self.table,)).fetchall()
+
+            for name, sql in indexes:
+                db.execute_sql('INSERT OR REPLACE INTO "{}" VALUES (?, ?, ?)'.format(_DROPPED_INDEXES),
+                               (self.table, name, sql))
+                db.execute_sql('DROP INDEX main."{}"'.format(name))
+
+        self.staged = db.execute_sql('SELECT COUNT(*) FROM bulk.staged').fetchone()[0]
+
+        # Rows left by an interrupted run are merged first, so scrapers resume after them.
+        if self.staged:
+            logging.info('Resuming bulk load into {} with {} staged rows'.format(self.table, self.staged))
+            self.checkpoint()
+
+    def _stage(self, rows):
+        n = _MAX_VARIABLES // len(self.columns)
+        placeholders = '({})'.format(', '.join('?' * len(self.columns)))
+
+        with db.atomic():
+            for i in range(0, len(rows), n):
+                chunk = rows[i:i+n]
+
+                db.execute_sql('INSERT INTO bulk.staged ({}) VALUES {}'.format(
+                    _column_list(self.columns),
+                    ', '.join([placeholders] * len(chunk))
+                ), [row.get(column) for row in chunk for column in self.columns])
+
+        self.staged += len(rows)
+
+        if self.staged >= self._CHECKPOINT:
+            self.checkpoint()
+
+def recover():
+    """Finishes bulk loads left over by interrupted runs."""
+
+    prefix, suffix = _scratch_path('*').split('*')
+    tables = {path[len(prefix):-len(suffix)] for path in glob.glob(_scratch_path('*'))}
+
+    if _exists('table', _DROPPED_INDEXES):
+        tables.update(tbl for (tbl,) in db.execute_sql('SELECT DISTINCT tbl FROM "{}"'.format(_DROPPED_INDEXES)))
+
+    if not tables:
+        logging.info('Nothing to recover')
+
+    for table in sorted(tables):
+        lock = _lock(table)
+
+        if lock is None:
+            logging.warning('Skipping {}: a bulk load into it is running'.format(table))
+            continue
+
+        try:
+            _finish(table)
+        finally:
+            lock.close()
+
+def _finish(table):
+    path = _scratch_path(table)
+
+    if os.path.exists(path):
+        _attach(table)
+
+        try:
+            merged = _merge(table)
+        finally:
+            _detach()
+
+        os.remove(path)
+        logging.info('Merged {} staged rows into {}'.format(merged, table))
+
+    with db.atomic():
+        if _exists('table', _DROPPED_INDEXES):
+            indexes = db.execute_sql('SELECT name, sql FROM "{}" WHERE tbl = ?'.format(_DROPPED_INDEXES),
+                                     (table,)).fetchall()
+
+            for name, sql in indexes:
+                # `create_tables(safe=True)` from a non-bulk run may have restored it already.
+                if not _exists('index', name):
+                    logging.info('Rebuilding index {}'.format(name))
+                    db.execute_sql(sql)
+
+            db.execute_sql('DELETE FROM "{}" WHERE tbl = ?'.format(_DROPPED_INDEXES), (table,))
+
+            if not db.execute_sql('SELECT 1 FROM "{}" LIMIT 1'.format(_DROPPED_INDEXES)).fetchone():
+                db.execute_sql('DROP TABLE "{}"'.format(_DROPPED_INDEXES))
+
+    # The lock is still held by the caller, see `_lock`.
+    os.remove(path + '.lock')
+
+def _merge(table):
+    column_list = _column_list(_columns(table))
+    ignore = db.execute_sql('SELECT ignore_duplicates FROM bulk.options').fetchone()[0]
+
+    with db.atomic():
+        cursor = db.execute_sql('INSERT {} INTO main."{}" ({}) SELECT {} FROM bulk.staged'
+                                .format('OR IGNORE' if ignore else '', table, column_list, column_list))
+        db.execute_sql('DELETE FROM bulk.staged')
+
+    return cursor.rowcount
+
+def _scratch_path(table):
+    return '{}.{}.bulk'.format(db.database, table)
+
+def _lock(table):
+    # The lock is released by the OS if the process dies.
+    path = _scratch_path(table) + '.lock'
+
+    while True:
+        file = open(path, 'a')
+
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return None
+
+        # The holder removes the file when it finishes, the lock is only valid if it is still there.
+        try:
+            if os.stat(path).st_ino == os.fstat(file.fileno()).st_ino:
+                return file
+        except FileNotFoundError:
+            pass
+
+        file.close()
+
+def _attach(table):
+    db.execute_sql('ATTACH DATABASE ? AS bulk', (_scratch_path(table),))
+    db.execute_sql('PRAGMA bulk.synchronous = OFF')
+
+def _detach():
+    db.execute_sql('DETACH DATABASE bulk')
+
+def _columns(table):
+    # Primary keys are left to the target table.
+    return [row[1] for row in db.execute_sql('PRAGMA main.table_info("{}")'.format(table)) if not row[5]]
+
+def _column_defs(table):
+    # NOT NULL is kept so that bad rows fail while staging, not at the merge.
+    return ', '.join('"{}" {}{}'.format(row[1], row[2], ' NOT NULL' if row[3] else '')
+                     for row in db.execute_sql('PRAGMA main.table_info("{}")'.format(table)) if not row[5])
+
+def _column_list(columns):
+    return ', '.join('"{}"'.format(column) for column in columns)
+
+def _exists(type, name):
+    return db.execute_sql('SELECT 1 FROM main.sqlite_master WHERE type = ? AND name = ?',
+                          (type, name)).fetchone() is not None
@@ -5,8 +5,9 @@ from playhouse.sqlite_ext import SqliteExtDatabase
 from peewee import Model
 
 _db_path = path.abspath(path.join(__file__, '../..', os.environ['DATABASE']))
+
+# The connection is opened by peewee on the first query.
 db = SqliteExtDatabase(_db_path)
-db.connect()
 
 class BaseModel(Model):
     class Meta:
@@ -10,7 +10,6 @@ from base.database import db
 from base.schemas import Tweet, News, TweetPolarity, NewsPolarity
 
 class Extractor:
-    _APP_ID = os.environ['S140_APP_ID']
     _CHUNK_SIZE = 10000
 
     def __init__(self, type, start=None, end=None):
@@ -22,6 +21,7 @@ class Extractor:
         self.start = datetime.strptime(start, '%Y-%m-%d') if start else datetime.utcfromtimestamp(0)
         self.end = datetime.strptime(end, '%Y-%m-%d') if end else datetime.utcnow()
         self.session = Session()
+        self.app_id = os.environ['S140_APP_ID']
 
         db.create_tables([self.model], safe=True);
 
@@ -60,7 +60,7 @@ class Extractor:
 
     def _fetch(self, chunk):
         r = self.session.post('http://www.sentiment140.com/api/bulkClassifyJson',
-                         params={'appid': self._APP_ID},
+                         params={'appid': self.app_id},
                          json={'data': chunk})
 
         data = r.json()['data']
@@ -10,10 +10,11 @@ import requests
 from pyquery import PyQuery as pq
 
 from base.database import db
+from base.bulk import Loader
+from base.schemas import Article
 
 class Scraper:
-    _API_KEY = os.environ['NY_API_KEY']
-    _URL = 'https://api.nytimes.com/svc/archive/v1/{year}/{month}.json?api-key=' + _API_KEY
+    _URL = 'https://api.nytimes.com/svc/archive/v1/{year}/{month}.json?api-key={api_key}'
     _START_YEAR = 2011
     _FINISH_YEAR = 2017
     _FINISH_MONTH = 2
@@ -27,21 +28,24 @@ class Scraper:
         'Microsoft': 'MSFT'
     }
 
-    def __init__(self):
+    def __init__(self, bulk=False):
+        self.api_key = os.environ['NY_API_KEY']
+
         db.create_tables([Article], safe=True)
+        self.loader = Loader(Article, bulk, ignore=False)
 
     def scrape(self):
         articles = self._extract_articles()
         n = 50
         count = 0
 
-        while True:
-            with db.atomic():
+        with self.loader:
+            while True:
                 chunk = list(islice(articles, n))
                 count += len(chunk)
                 logging.info('Saved {} articles'.format(count))
 
-                if len(chunk) != 0: Article.insert_many(chunk).execute()
+                self.loader.insert(chunk)
                 if len(chunk) < n: break
 
     def _extract_articles(self):
@@ -91,7 +95,7 @@ class Scraper:
     def _extract_archive(self, params):
         logging.info('Extracting archive {month:02}/{year}'.format(**params))
 
-        response = requests.get(self._URL.format(**params))
+        response = requests.get(self._URL.format(api_key=self.api_key, **params))
 
         logging.info('Loading archive: {}'.format(response.url))
 
@@ -6,18 +6,22 @@ import urllib
 import requests
 
 from base.database import db
+from base.bulk import Loader
+from base.schemas import News
 
 class Scraper:
-    def __init__(self, ticker, continuation=''):
+    def __init__(self, ticker, continuation='', bulk=False):
         self.ticker = ticker
         self.continuation = continuation
         self.extracted = 0
 
         db.create_tables([News], safe=True)
+        self.loader = Loader(News, bulk)
 
     def scrape(self):
-        while self.continuation is not None:
-            self._step()
+        with self.loader:
+            while self.continuation is not None:
+                self._step()
 
     def _step(self):
         response = self._fetch()
@@ -34,9 +38,7 @@ class Scraper:
             self.extracted, len(news), oldest, self.continuation
         ))
 
-        with db.atomic():
-            for i in range(0, len(news), 100):
-                News.insert_many(news[i:i+100]).on_conflict('IGNORE').execute()
+        self.loader.insert(news)
 
     def _fetch(self):
         r = requests.get('http://cloud.feedly.com/v3/streams/contents', params={
@@ -3,13 +3,13 @@ import json
 import time
 import logging
 from datetime import datetime
-from itertools import islice
 from collections import OrderedDict
 import time
 
 import requests
 
 from base.database import db
+from base.bulk import Loader
 from base.schemas import Quote
 
 class Scraper:
@@ -28,10 +28,15 @@ class Scraper:
         ("WFC", 22138), ("YHOO", 19075), ("YNDX", 81151)
     ])
 
-    def __init__(self):
+    def __init__(self, bulk=False):
         db.create_tables([Quote], safe=True)
+        self.loader = Loader(Quote, bulk)
 
     def scrape(self):
+        with self.loader:
+            self._scrape()
+
+    def _scrape(self):
         for ticker in self._TICKERS.keys():
             for interval in self._INTERVAL_IDS:
                 response = self._load_quotes(ticker, interval)
@@ -45,16 +50,7 @@ class Scraper:
                     continue # Finam does not have quotes for this period
 
                 quotes = self._extract_quotes(response, interval)
-                n = 100
-
-                with db.atomic():
-                    while True:
-                        chunk = list(islice(quotes, n))
-
-                        if chunk:
-                            Quote.insert_many(chunk).on_conflict('IGNORE').execute()
-
-                        if len(chunk) < n: break
+                self.loader.insert(list(quotes))
 
     def _load_quotes(self, ticker, interval):
         interval_id = self._INTERVAL_IDS[interval]
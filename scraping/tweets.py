@@ -9,6 +9,7 @@ from requests import Session
 from pyquery import PyQuery
 
 from base.database import db
+from base.bulk import Loader
 from base.schemas import Tweet
 
 class Scraper:
@@ -19,7 +20,7 @@ class Scraper:
 
     random.shuffle(_USER_AGENTS)
 
-    def __init__(self, ticker, until=None):
+    def __init__(self, ticker, until=None, bulk=False):
         self.session = Session()
         self.ticker = ticker
         self.max_position = ''
@@ -33,20 +34,22 @@ class Scraper:
         self.recent_stats = deque()
 
         db.create_tables([Tweet], safe=True)
-
-        if until:
-            self.until = datetime.strptime(until, '%Y-%m-%d')
-        else:
-            self.until = self._get_oldest_date()
+        self.loader = Loader(Tweet, bulk)
+        self.until = datetime.strptime(until, '%Y-%m-%d') if until else None
 
     def scrape(self):
         self.startup = time.time()
         self.time_mark = time.time()
 
-        logging.info('Starting at %s', self.until)
+        with self.loader:
+            # Rows staged by an interrupted bulk run are merged on entering the loader.
+            if self.until is None:
+                self.until = self._get_oldest_date()
+
+            logging.info('Starting at %s', self.until)
 
-        while self._step():
-            pass
+            while self._step():
+                pass
 
     def _step(self):
         max_attempts = max(len(self._USER_AGENTS), 4)
@@ -100,9 +103,7 @@ class Scraper:
 
         self.max_position = response['min_position']
 
-        if tweets:
-            with db.atomic():
-                Tweet.insert_many(tweets).on_conflict('IGNORE').execute()
+        self.loader.insert(tweets)
 
         return True
 